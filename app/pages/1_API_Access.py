@@ -2,7 +2,17 @@
 
 import streamlit as st
 import requests
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import numpy as np
+import ijson
+import urllib3
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from urllib3.util.retry import Retry
 
 
 st.title("API Access")
@@ -11,6 +21,41 @@ st.markdown("Explore JSONPlaceholder API endpoints and visualize the data")
 # Base URL for JSONPlaceholder API
 BASE_URL = "https://jsonplaceholder.typicode.com"
 
+# Large list endpoints that are stream-parsed instead of loaded in one go
+STREAMED_ENDPOINTS = ("/photos", "/comments")
+
+# Known column layout and dtypes for each endpoint, so DataFrames are built
+# without runtime type inference
+SCHEMAS = {
+    "Posts": ["userId", "id", "title", "body"],
+    "Comments": ["postId", "id", "name", "email", "body"],
+    "Albums": ["userId", "id", "title"],
+    "Photos": ["albumId", "id", "title", "url", "thumbnailUrl"],
+    "Todos": ["userId", "id", "title", "completed"],
+    "Users": ["id", "name", "username", "email", "address", "phone", "website", "company"]
+}
+DTYPES = {
+    "Posts": {"userId": "int16", "id": "int32"},
+    "Comments": {"postId": "int32", "id": "int32"},
+    "Albums": {"userId": "int16", "id": "int32"},
+    "Photos": {"albumId": "int32", "id": "int32"},
+    "Todos": {"userId": "int16", "id": "int32", "completed": "bool"},
+    "Users": {"id": "int32"}
+}
+
+# Number of records each endpoint serves (IDs run from 1 to this value)
+RECORD_COUNTS = {
+    "Posts": 100,
+    "Comments": 500,
+    "Albums": 100,
+    "Photos": 5000,
+    "Todos": 200,
+    "Users": 10
+}
+
+# Largest ID range fetched in one go
+MAX_MULTI_IDS = 50
+
 # Sidebar for endpoint selection
 st.sidebar.header("API Endpoints")
 endpoint_options = {
@@ -55,34 +100,248 @@ if selected_endpoint in ["Posts", "Comments", "Albums", "Photos", "Todos", "User
 else:
     specific_id = 0
 
+# Allow fetching several IDs at once (fetched concurrently)
+st.sidebar.caption(
+    f"Or fetch a range of {selected_endpoint.lower()} by ID "
+    f"(up to {MAX_MULTI_IDS}; overrides the options above):"
+)
+range_start = st.sidebar.number_input(
+    "From ID (0 to disable):",
+    min_value=0,
+    max_value=RECORD_COUNTS[selected_endpoint],
+    value=0,
+    step=1
+)
+range_end = st.sidebar.number_input(
+    "To ID:",
+    min_value=0,
+    max_value=RECORD_COUNTS[selected_endpoint],
+    value=0,
+    step=1
+)
+if range_start > 0 and range_end >= range_start:
+    if range_end - range_start + 1 > MAX_MULTI_IDS:
+        range_end = range_start + MAX_MULTI_IDS - 1
+        st.sidebar.warning(f"Range limited to IDs {range_start}-{range_end}")
+    multi_ids = list(range(range_start, range_end + 1))
+else:
+    multi_ids = []
+
+# Shared HTTP session, created once and reused across reruns and users so
+# keep-alive connections to the API are pooled instead of reopened each time
+@st.cache_resource
+def get_session():
+    """Create a pooled requests Session for the JSONPlaceholder API"""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    ))
+    session.headers["Accept"] = "application/json"
+    return session
+
+# Validators (ETag / Last-Modified) and bodies of previous responses, keyed by
+# URL, so expired cache entries can be revalidated with a conditional GET.
+# Bodies are kept alongside fetch_data's cache, so the store is bounded to the
+# most recently used URLs.
+ETAG_STORE_MAX_ENTRIES = 8
+
+@st.cache_resource
+def get_etag_store():
+    """Create the shared store of conditional-request validators"""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def etag_lookup(url):
+    """Return the stored validators and body for a URL, if any"""
+    store = get_etag_store()
+    with store["lock"]:
+        entry = store["entries"].get(url)
+        if entry:
+            store["entries"].move_to_end(url)
+        return entry
+
+def etag_remember(url, entry):
+    """Store validators and body for a URL, evicting the least recently used"""
+    store = get_etag_store()
+    with store["lock"]:
+        store["entries"][url] = entry
+        store["entries"].move_to_end(url)
+        while len(store["entries"]) > ETAG_STORE_MAX_ENTRIES:
+            store["entries"].popitem(last=False)
+
+# Parse a JSON array item by item straight off the socket. Reading the raw
+# stream bypasses requests' own error handling, so failures are re-raised as
+# the matching requests exceptions for the caller to report.
+def parse_streamed(response):
+    """Stream-parse a JSON array response into a list of records"""
+    response.raw.decode_content = True
+    try:
+        return list(ijson.items(response.raw, "item", use_float=True))
+    except urllib3.exceptions.DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e, response=response)
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(e, response=response)
+    except urllib3.exceptions.HTTPError as e:
+        raise requests.exceptions.ConnectionError(e, response=response)
+    except ijson.JSONError as e:
+        raise requests.exceptions.InvalidJSONError(e, response=response)
+
 # Make API request
+# Cached so repeat fetches of the same endpoint/id/user skip the network.
+# Errors are raised (not returned) so failed requests are never cached.
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
 def fetch_data(endpoint_path, resource_id=0, user_id=0):
     """Fetch data from JSONPlaceholder API"""
-    try:
-        if resource_id > 0:
-            # Fetch specific resource by ID
-            url = f"{BASE_URL}{endpoint_path}/{resource_id}"
-        elif user_id > 0 and endpoint_path == "/posts":
-            # Filter posts by user ID
-            url = f"{BASE_URL}{endpoint_path}?userId={user_id}"
+    if resource_id > 0:
+        # Fetch specific resource by ID
+        url = f"{BASE_URL}{endpoint_path}/{resource_id}"
+    elif user_id > 0 and endpoint_path == "/posts":
+        # Filter posts by user ID
+        url = f"{BASE_URL}{endpoint_path}?userId={user_id}"
+    else:
+        # Fetch all resources
+        url = f"{BASE_URL}{endpoint_path}"
+    
+    # Revalidate against the last response for this URL if we have one
+    previous = etag_lookup(url)
+    headers = {}
+    if previous:
+        if previous["etag"]:
+            headers["If-None-Match"] = previous["etag"]
+        if previous["last_modified"]:
+            headers["If-Modified-Since"] = previous["last_modified"]
+    
+    streamed = resource_id == 0 and endpoint_path in STREAMED_ENDPOINTS
+    with get_session().get(url, timeout=5, stream=streamed, headers=headers) as response:
+        if response.status_code == 304 and previous:
+            # Unchanged on the server: reuse the stored body, status and version
+            return previous["data"], previous["status_code"], previous["version"]
+        response.raise_for_status()
+        if streamed:
+            data = parse_streamed(response)
         else:
-            # Fetch all resources
-            url = f"{BASE_URL}{endpoint_path}"
+            data = response.json()
         
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        return response.json(), response.status_code, None
-    except requests.exceptions.RequestException as e:
-        return None, None, str(e)
+        # New token for each downloaded body; derived caches key on it
+        version = uuid.uuid4().hex
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            etag_remember(url, {
+                "etag": etag,
+                "last_modified": last_modified,
+                "status_code": response.status_code,
+                "version": version,
+                "data": data
+            })
+        return data, response.status_code, version
+
+# Fetch several resources concurrently, each through the cached fetch_data so
+# repeat requests for the same IDs are served from the cache
+def fetch_many(endpoint_path, ids):
+    """Fetch multiple JSONPlaceholder resources by ID in parallel"""
+    # Worker threads need the script context to use Streamlit's caches
+    ctx = get_script_run_ctx()
+
+    def attach_ctx():
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=8, initializer=attach_ctx) as executor:
+        results = list(executor.map(lambda i: fetch_data(endpoint_path, i), ids))
+    return (
+        [data for data, _, _ in results],
+        [status for _, status, _ in results],
+        [version for _, _, version in results]
+    )
+
+# Convert fetched JSON to a DataFrame once per dataset. The fetch key holds
+# the request options plus the version of the downloaded body, so a refreshed
+# payload gets a new entry; the underscore-prefixed data list is not hashed.
+@st.cache_data(max_entries=64, show_spinner=False)
+def to_frame(fetch_key, _data_list):
+    """Build a DataFrame from a list of API records"""
+    endpoint_name = fetch_key[0]
+    # Transpose records into columns so pandas builds each column in one pass
+    try:
+        columns = {k: [d[k] for d in _data_list] for k in SCHEMAS[endpoint_name]}
+    except KeyError as e:
+        raise ValueError(f"record is missing field {e}")
+    df = pd.DataFrame(columns)
+    return df.astype(DTYPES[endpoint_name])
+
+# Serialize a dataset to CSV once; keyed by the fetch key like to_frame
+@st.cache_data(max_entries=16, show_spinner=False)
+def to_csv_bytes(fetch_key, _df):
+    """Encode a DataFrame as UTF-8 CSV bytes"""
+    return _df.to_csv(index=False).encode("utf-8")
+
+# Per-group record counts, computed once per dataset and column
+@st.cache_data(max_entries=64, show_spinner=False)
+def grouped_counts(fetch_key, col, _df):
+    """Count records per value of a column, sorted by that value"""
+    return _df.groupby(col, sort=True).size()
+
+# Preformatted Users details, built once per dataset so reruns only render
+@st.cache_data(max_entries=16, show_spinner=False)
+def format_users(fetch_key, _users):
+    """Return (id, name, markdown details) for each user record"""
+    formatted = []
+    for user in _users:
+        lines = [
+            f"**Username:** {user.get('username', 'N/A')}",
+            f"**Email:** {user.get('email', 'N/A')}",
+            f"**Phone:** {user.get('phone', 'N/A')}",
+            f"**Website:** {user.get('website', 'N/A')}"
+        ]
+        if 'address' in user:
+            lines.append(f"**Address:** {user['address'].get('street', '')}, {user['address'].get('city', '')}")
+        if 'company' in user:
+            lines.append(f"**Company:** {user['company'].get('name', 'N/A')}")
+        formatted.append((user.get('id', 'N/A'), user.get('name', 'N/A'), "\n\n".join(lines)))
+    return formatted
+
+# Top-k counts for small non-negative integer IDs: bincount counts every ID in
+# one pass, then a stable full sort of the counts picks the top k with ties
+# broken by lowest ID so the chart is deterministic
+def top_k_counts(series, k=10):
+    """Return the k most frequent IDs in a series with their counts"""
+    counts = np.bincount(series.to_numpy())
+    k = min(k, np.count_nonzero(counts))
+    if k == 0:
+        return pd.Series(dtype="int64")
+    idx = np.argsort(-counts, kind="stable")[:k]
+    return pd.Series(counts[idx], index=idx)
 
 # Fetch button
 if st.button("Fetch Data", type="primary"):
+    # Drop the previous DataFrame; it is rebuilt below on a successful fetch
+    st.session_state.pop('api_df', None)
     with st.spinner(f"Fetching {selected_endpoint.lower()}..."):
-        data, status_code, error = fetch_data(
-            endpoint_options[selected_endpoint],
-            specific_id if specific_id > 0 else 0,
-            user_id_filter if user_id_filter > 0 else 0
-        )
+        try:
+            if multi_ids:
+                endpoint_path = endpoint_options[selected_endpoint]
+                data, statuses, versions = fetch_many(endpoint_path, multi_ids)
+                status_code = ", ".join(str(code) for code in sorted(set(statuses)))
+                version = tuple(versions)
+            else:
+                data, status_code, version = fetch_data(
+                    endpoint_options[selected_endpoint],
+                    specific_id if specific_id > 0 else 0,
+                    user_id_filter if user_id_filter > 0 else 0
+                )
+            fetch_key = (
+                selected_endpoint, specific_id, user_id_filter, tuple(multi_ids), version
+            )
+            # Build the DataFrame once here so later reruns can reuse it
+            if data:
+                df = to_frame(fetch_key, [data] if isinstance(data, dict) else data)
+            error = None
+        except requests.exceptions.RequestException as e:
+            data, status_code, error = None, None, str(e)
+        except (ValueError, TypeError) as e:
+            # Records that don't match the endpoint's schema
+            data, status_code, error = None, None, f"Unexpected response format: {e}"
         
         if error:
             st.error(f"Error fetching data: {error}")
@@ -92,9 +351,106 @@ if st.button("Fetch Data", type="primary"):
             # Store data in session state for visualization
             st.session_state['api_data'] = data
             st.session_state['endpoint_name'] = selected_endpoint
+            st.session_state['fetch_key'] = fetch_key
+            st.session_state['api_df'] = df
         else:
             st.warning("No data returned from API")
 
+# Insight renderers for each endpoint
+def render_posts(df, data_list):
+    """Posts-specific visualizations"""
+    if len(data_list) > 0:
+        # Count posts by user
+        if 'userId' in df.columns:
+            posts_by_user = grouped_counts(st.session_state.get('fetch_key'), 'userId', df)
+            st.bar_chart(posts_by_user)
+            st.caption("Number of posts per user")
+        
+        # Word count analysis (if we have titles)
+        if 'title' in df.columns and len(df) > 0:
+            avg_len = df['title'].str.len().mean()
+            st.metric("Average Title Length", f"{avg_len:.1f} characters")
+
+def render_comments(df, data_list):
+    """Comments-specific visualizations"""
+    if len(data_list) > 0 and 'postId' in df.columns:
+        comments_by_post = top_k_counts(df['postId'], 10)
+        st.bar_chart(comments_by_post)
+        st.caption("Top 10 posts by comment count")
+
+def render_users(df, data_list):
+    """Users-specific visualizations"""
+    if len(data_list) > 0:
+        st.write("User Information:")
+        for user_id, name, details in format_users(st.session_state.get('fetch_key'), data_list):
+            with st.expander(f"User {user_id}: {name}"):
+                st.markdown(details)
+
+def render_todos(df, data_list):
+    """Todos-specific visualizations"""
+    if len(data_list) > 0 and 'completed' in df.columns:
+        completed_arr = np.asarray(df['completed'], dtype=bool)
+        completed_count = int(completed_arr.sum())
+        total_count = completed_arr.size
+        completion_rate = (completed_count / total_count * 100) if total_count > 0 else 0
+        
+        col1, col2 = st.columns(2)
+        col1.metric("Completed", completed_count)
+        col2.metric("Completion Rate", f"{completion_rate:.1f}%")
+        
+        # Completed vs pending chart
+        st.bar_chart(pd.Series(
+            [completed_count, total_count - completed_count],
+            index=['Completed', 'Pending'],
+            name='Count'
+        ))
+
+def render_albums(df, data_list):
+    """Albums-specific visualizations"""
+    if len(data_list) > 0 and 'userId' in df.columns:
+        albums_by_user = grouped_counts(st.session_state.get('fetch_key'), 'userId', df)
+        st.bar_chart(albums_by_user)
+        st.caption("Number of albums per user")
+
+def render_photos(df, data_list):
+    """Photos-specific visualizations"""
+    if len(data_list) > 0:
+        st.write(f"Total photos: {len(data_list)}")
+        if 'albumId' in df.columns:
+            photos_by_album = top_k_counts(df['albumId'], 10)
+            st.bar_chart(photos_by_album)
+            st.caption("Top 10 albums by photo count")
+        
+        # Display sample images if thumbnailUrl exists
+        if 'thumbnailUrl' in df.columns and len(df) > 0:
+            st.subheader("Sample Images")
+            sample_photos = df.head(6)
+            cols = st.columns(3)
+            titles = sample_photos['title'].tolist() if 'title' in sample_photos.columns else ['Photo'] * len(sample_photos)
+            for idx, (url, title) in enumerate(zip(sample_photos['thumbnailUrl'].tolist(), titles)):
+                with cols[idx % 3]:
+                    st.image(url, caption=title[:30])
+
+# Endpoint name -> insight renderer
+HANDLERS = {
+    "Posts": render_posts,
+    "Comments": render_comments,
+    "Users": render_users,
+    "Todos": render_todos,
+    "Albums": render_albums,
+    "Photos": render_photos
+}
+
+# Endpoint-specific insights, wrapped in a fragment so any interactive widgets
+# added to the renderers rerun only this section. The current renderers only
+# display data, so for now this is structural.
+@st.fragment
+def render_insights(endpoint_name, df, data_list):
+    """Render visualizations for the fetched endpoint data"""
+    handler = HANDLERS.get(endpoint_name)
+    if handler:
+        handler(df, data_list)
+
 # Display data if available
 if 'api_data' in st.session_state and st.session_state['api_data']:
     data = st.session_state['api_data']
@@ -124,98 +480,24 @@ if 'api_data' in st.session_state and st.session_state['api_data']:
     
     # Convert to DataFrame and display
     st.subheader("Data Table")
-    df = pd.DataFrame(data_list)
+    if 'api_df' not in st.session_state:
+        st.session_state['api_df'] = to_frame(st.session_state.get('fetch_key'), data_list)
+    df = st.session_state['api_df']
     st.dataframe(df, use_container_width=True, height=400)
     
-    # Display raw JSON
-    with st.expander("View Raw JSON"):
-        st.json(data)
+    # Display raw JSON only on request; expander contents are sent to the
+    # browser even while collapsed
+    if st.checkbox("View Raw JSON", key='show_raw_json'):
+        st.json(st.session_state['api_data'])
     
     # Additional visualizations based on endpoint type
     st.subheader("Data Insights")
     
-    if endpoint_name == "Posts":
-        # Posts-specific visualizations
-        if len(data_list) > 0:
-            # Count posts by user
-            if 'userId' in df.columns:
-                posts_by_user = df['userId'].value_counts().sort_index()
-                st.bar_chart(posts_by_user)
-                st.caption("Number of posts per user")
-            
-            # Word count analysis (if we have titles)
-            if 'title' in df.columns and len(df) > 0:
-                df['title_length'] = df['title'].str.len()
-                st.metric("Average Title Length", f"{df['title_length'].mean():.1f} characters")
-    
-    elif endpoint_name == "Comments":
-        # Comments-specific visualizations
-        if len(data_list) > 0 and 'postId' in df.columns:
-            comments_by_post = df['postId'].value_counts().head(10)
-            st.bar_chart(comments_by_post)
-            st.caption("Top 10 posts by comment count")
-    
-    elif endpoint_name == "Users":
-        # Users-specific visualizations
-        if len(data_list) > 0:
-            st.write("User Information:")
-            for user in data_list:
-                with st.expander(f"User {user.get('id', 'N/A')}: {user.get('name', 'N/A')}"):
-                    st.write(f"**Username:** {user.get('username', 'N/A')}")
-                    st.write(f"**Email:** {user.get('email', 'N/A')}")
-                    st.write(f"**Phone:** {user.get('phone', 'N/A')}")
-                    st.write(f"**Website:** {user.get('website', 'N/A')}")
-                    if 'address' in user:
-                        st.write(f"**Address:** {user['address'].get('street', '')}, {user['address'].get('city', '')}")
-                    if 'company' in user:
-                        st.write(f"**Company:** {user['company'].get('name', 'N/A')}")
-    
-    elif endpoint_name == "Todos":
-        # Todos-specific visualizations
-        if len(data_list) > 0 and 'completed' in df.columns:
-            completed_count = df['completed'].sum()
-            total_count = len(df)
-            completion_rate = (completed_count / total_count * 100) if total_count > 0 else 0
-            
-            col1, col2 = st.columns(2)
-            col1.metric("Completed", completed_count)
-            col2.metric("Completion Rate", f"{completion_rate:.1f}%")
-            
-            # Pie chart data
-            completion_data = pd.DataFrame({
-                'Status': ['Completed', 'Pending'],
-                'Count': [completed_count, total_count - completed_count]
-            })
-            st.bar_chart(completion_data.set_index('Status'))
-    
-    elif endpoint_name == "Albums":
-        # Albums-specific visualizations
-        if len(data_list) > 0 and 'userId' in df.columns:
-            albums_by_user = df['userId'].value_counts().sort_index()
-            st.bar_chart(albums_by_user)
-            st.caption("Number of albums per user")
-    
-    elif endpoint_name == "Photos":
-        # Photos-specific visualizations
-        if len(data_list) > 0:
-            st.write(f"Total photos: {len(data_list)}")
-            if 'albumId' in df.columns:
-                photos_by_album = df['albumId'].value_counts().head(10)
-                st.bar_chart(photos_by_album)
-                st.caption("Top 10 albums by photo count")
-            
-            # Display sample images if thumbnailUrl exists
-            if 'thumbnailUrl' in df.columns and len(df) > 0:
-                st.subheader("Sample Images")
-                sample_photos = df.head(6)
-                cols = st.columns(3)
-                for idx, (_, photo) in enumerate(sample_photos.iterrows()):
-                    with cols[idx % 3]:
-                        st.image(photo.get('thumbnailUrl', ''), caption=photo.get('title', 'Photo')[:30])
+    render_insights(endpoint_name, df, data_list)
     
     # Download button
     st.markdown("---")
-    csv = df.to_csv(index=False)
+    csv = to_csv_bytes(st.session_state.get('fetch_key'), df)
     st.download_button(
         label="Download data as CSV",
         data=csv,